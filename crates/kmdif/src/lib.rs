@@ -153,32 +153,45 @@ fn allocate_dma_buffer(
     Ok(output)
 }
 
+fn open_device_fd(device_id: usize) -> Result<std::fs::File, PciOpenError> {
+    std::fs::OpenOptions::new()
+        .read(true)
+        .write(true)
+        .open(format!("/dev/tenstorrent/{device_id}"))
+        .map_err(|err| PciOpenError::DeviceOpenFailed {
+            id: device_id,
+            source: err,
+        })
+}
+
+fn get_device_info(fd: &std::fs::File, device_id: usize) -> Result<GetDeviceInfo, PciOpenError> {
+    let mut device_info = GetDeviceInfo::default();
+    device_info.input.output_size_bytes = std::mem::size_of::<ioctl::GetDeviceInfoOut>() as u32;
+
+    if let Err(errorno) = unsafe { ioctl::get_device_info(fd.as_raw_fd(), &mut device_info) } {
+        return Err(PciOpenError::IoctlError {
+            name: "get_device_info".to_string(),
+            id: device_id,
+            source: errorno,
+        });
+    }
+
+    Ok(device_info)
+}
+
 impl PciDevice {
-    pub fn open(device_id: usize) -> Result<PciDevice, PciOpenError> {
-        let fd = std::fs::OpenOptions::new()
-            .read(true)
-            .write(true)
-            .open(format!("/dev/tenstorrent/{device_id}"));
-        let fd = match fd {
-            Ok(fd) => fd,
-            Err(err) => {
-                return Err(PciOpenError::DeviceOpenFailed {
-                    id: device_id,
-                    source: err,
-                })
-            }
-        };
+    /// Get the arch of a device without fully opening it.
+    /// The device node is opened to ask the driver for the device info, but no bars are mapped.
+    pub fn read_arch(device_id: usize) -> Result<Arch, PciOpenError> {
+        let fd = open_device_fd(device_id)?;
 
-        let mut device_info = GetDeviceInfo::default();
-        device_info.input.output_size_bytes = std::mem::size_of::<ioctl::GetDeviceInfoOut>() as u32;
+        Ok(Arch::from(&get_device_info(&fd, device_id)?.output))
+    }
 
-        if let Err(errorno) = unsafe { ioctl::get_device_info(fd.as_raw_fd(), &mut device_info) } {
-            return Err(PciOpenError::IoctlError {
-                name: "get_device_info".to_string(),
-                id: device_id,
-                source: errorno,
-            });
-        }
+    pub fn open(device_id: usize) -> Result<PciDevice, PciOpenError> {
+        let fd = open_device_fd(device_id)?;
+
+        let device_info = get_device_info(&fd, device_id)?;
 
         let max_dma_buf_size_log2 = device_info.output.max_dma_buf_size_log2;
 
@@ -49,6 +49,8 @@ pub enum ArcMsg {
     GetAiclk,
 
     GetHarvesting,
+
+    ReadTs { sensor: u16 },
 }
 
 impl ArcMsg {
@@ -75,6 +77,7 @@ impl ArcMsg {
                 ArcState::A5 => 0xA5,
             },
             ArcMsg::FwVersion(_) => 0xb9,
+            ArcMsg::ReadTs { .. } => 0x1B,
         };
 
         0xaa00 | code
@@ -95,6 +98,7 @@ impl ArcMsg {
             | ArcMsg::GetAiclk
             | ArcMsg::GetHarvesting
             | ArcMsg::SetArcState { .. } => (0, 0),
+            ArcMsg::ReadTs { sensor } => (*sensor, 0),
             ArcMsg::FwVersion(ty) => match ty {
                 FwType::ArcL2 => (0, 0),
                 FwType::FwBundle => (1, 0),
@@ -108,6 +112,7 @@ impl ArcMsg {
         let msg = 0xFF & msg;
         match msg {
             0x11 => ArcMsg::Nop,
+            0x1B => ArcMsg::ReadTs { sensor: arg0 },
             0x34 => ArcMsg::GetAiclk,
             0xbb => ArcMsg::ResetSafeClks { arg },
             0xaf => ArcMsg::ToggleTensixReset { arg },
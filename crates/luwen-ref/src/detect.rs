@@ -2,14 +2,30 @@
 // SPDX-License-Identifier: Apache-2.0
 
 use kmdif::PciDevice;
+use luwen_core::Arch;
 use luwen_if::{chip::Chip, CallbackStorage};
 
 use crate::{comms_callback, error::LuwenError, ExtendedPciDevice};
 
 pub fn detect_chips() -> Result<Vec<Chip>, LuwenError> {
-    let mut chips = Vec::new();
+    detect_chips_with_arch(None)
+}
+
+/// Like `detect_chips`, but if `arch` is given, pci devices of any other arch are skipped.
+/// Skipped devices are only asked for their arch, no bars are mapped and no arc init is done for them.
+pub fn detect_chips_with_arch(arch: Option<&[Arch]>) -> Result<Vec<Chip>, LuwenError> {
+    let mut device_ids = PciDevice::scan();
+    if let Some(arch) = arch {
+        let mut filtered = Vec::with_capacity(device_ids.len());
+        for device_id in device_ids {
+            if arch.contains(&PciDevice::read_arch(device_id)?) {
+                filtered.push(device_id);
+            }
+        }
+        device_ids = filtered;
+    }
 
-    let device_ids = PciDevice::scan();
+    let mut chips = Vec::with_capacity(device_ids.len());
     for device_id in device_ids {
         let ud = ExtendedPciDevice::open(device_id)?;
 
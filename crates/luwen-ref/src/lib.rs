@@ -16,7 +16,7 @@ mod wormhole;
 
 use wormhole::ethernet::{self, EthCommCoord};
 
-pub use detect::detect_chips;
+pub use detect::{detect_chips, detect_chips_with_arch};
 pub use kmdif::{DmaBuffer, DmaConfig, PciDevice, Tlb};
 
 #[derive(Clone)]
@@ -1,6 +1,6 @@
 # Generated content DO NOT EDIT
 @staticmethod
-def detect_chips():
+def detect_chips(force_refresh=False, arch=None):
     """
     """
     pass
@@ -42,6 +42,14 @@ class PciChip:
         """
         pass
 
+    def arc_msg_bulk_readts(self, count=8, use_second_mailbox=False, timeout=1.0):
+        """
+        Read the raw value of the first `count` temperature sensors.
+        The fw has no bulk read message, so this still sends one ReadTs per sensor,
+        but it does so back to back without returning to python in between.
+        """
+        pass
+
     def as_gs(self):
         """
         """
@@ -97,6 +105,11 @@ class PciChip:
         """
         pass
 
+    def get_pci_interface_id(self):
+        """
+        """
+        pass
+
     def get_telemetry(self):
         """
         """
@@ -137,6 +150,14 @@ class PciChip:
         """
         pass
 
+    def read_ts(self, sensor_idx, /):
+        """
+        Read the raw value of a single temperature sensor.
+        Same as arc_msg(0x1B, arg0=sensor_idx, arg1=0) but without the keyword argument handling.
+        The message always goes to the first mailbox with a 1s timeout, use arc_msg if either needs to change.
+        """
+        pass
+
     pass
 
 class PciGrayskull:
@@ -145,6 +166,14 @@ class PciGrayskull:
         """
         pass
 
+    def arc_msg_bulk_readts(self, count=8, use_second_mailbox=False, timeout=1.0):
+        """
+        Read the raw value of the first `count` temperature sensors.
+        The fw has no bulk read message, so this still sends one ReadTs per sensor,
+        but it does so back to back without returning to python in between.
+        """
+        pass
+
     def axi_read(self, addr, data):
         """
         """
@@ -215,6 +244,14 @@ class PciGrayskull:
         """
         pass
 
+    def read_ts(self, sensor_idx, /):
+        """
+        Read the raw value of a single temperature sensor.
+        Same as arc_msg(0x1B, arg0=sensor_idx, arg1=0) but without the keyword argument handling.
+        The message always goes to the first mailbox with a 1s timeout, use arc_msg if either needs to change.
+        """
+        pass
+
     def set_default_tlb(self, index):
         """
         """
@@ -238,6 +275,14 @@ class PciWormhole:
         """
         pass
 
+    def arc_msg_bulk_readts(self, count=8, use_second_mailbox=False, timeout=1.0):
+        """
+        Read the raw value of the first `count` temperature sensors.
+        The fw has no bulk read message, so this still sends one ReadTs per sensor,
+        but it does so back to back without returning to python in between.
+        """
+        pass
+
     def axi_read(self, addr, data):
         """
         """
@@ -308,6 +353,14 @@ class PciWormhole:
         """
         pass
 
+    def read_ts(self, sensor_idx, /):
+        """
+        Read the raw value of a single temperature sensor.
+        Same as arc_msg(0x1B, arg0=sensor_idx, arg1=0) but without the keyword argument handling.
+        The message always goes to the first mailbox with a 1s timeout, use arc_msg if either needs to change.
+        """
+        pass
+
     def set_default_tlb(self, index):
         """
         """
@@ -326,6 +379,14 @@ class RemoteWormhole:
         """
         pass
 
+    def arc_msg_bulk_readts(self, count=8, use_second_mailbox=False, timeout=1.0):
+        """
+        Read the raw value of the first `count` temperature sensors.
+        The fw has no bulk read message, so this still sends one ReadTs per sensor,
+        but it does so back to back without returning to python in between.
+        """
+        pass
+
     def axi_read(self, addr, data):
         """
         """
@@ -381,5 +442,13 @@ class RemoteWormhole:
         """
         pass
 
+    def read_ts(self, sensor_idx, /):
+        """
+        Read the raw value of a single temperature sensor.
+        Same as arc_msg(0x1B, arg0=sensor_idx, arg1=0) but without the keyword argument handling.
+        The message always goes to the first mailbox with a 1s timeout, use arc_msg if either needs to change.
+        """
+        pass
+
     pass
 
@@ -2,6 +2,7 @@
 // SPDX-License-Identifier: Apache-2.0
 
 use std::ops::{Deref, DerefMut};
+use std::sync::{Mutex, OnceLock};
 
 use luwen_if::chip::{
     wait_for_init, ArcMsg, ArcMsgOk, ArcMsgOptions, ChipImpl, HlComms, HlCommsInterface, StatusInfo,
@@ -11,8 +12,22 @@ use luwen_ref::{DmaConfig, ExtendedPciDeviceWrapper};
 use pyo3::exceptions::PyException;
 use pyo3::prelude::*;
 
-#[pyclass]
-pub struct PciChip(luwen_if::chip::Chip);
+/// The downcast chip wrappers handed out by `PciChip::as_wh` and `PciChip::as_gs`.
+/// These are built on first use so that repeated calls return the same python object.
+#[derive(Default)]
+struct DowncastCache {
+    wh: OnceLock<Option<Py<PciWormhole>>>,
+    gs: OnceLock<Option<Py<PciGrayskull>>>,
+}
+
+#[pyclass(weakref)]
+pub struct PciChip(luwen_if::chip::Chip, DowncastCache);
+
+impl From<luwen_if::chip::Chip> for PciChip {
+    fn from(value: luwen_if::chip::Chip) -> Self {
+        PciChip(value, DowncastCache::default())
+    }
+}
 
 impl Deref for PciChip {
     type Target = luwen_if::chip::Chip;
@@ -249,6 +264,27 @@ impl From<luwen_if::chip::AxiData> for AxiData {
     }
 }
 
+/// Send a ReadTs message and wait for the (arg, rc) reply.
+/// Errors are returned as strings so that this can be called from inside `allow_threads`.
+fn read_ts_raw<T: ChipImpl>(
+    chip: &T,
+    sensor: u16,
+    use_second_mailbox: bool,
+    timeout: std::time::Duration,
+) -> Result<(u32, u32), String> {
+    match chip.arc_msg(ArcMsgOptions {
+        addrs: None,
+        msg: ArcMsg::ReadTs { sensor },
+        wait_for_done: true,
+        use_second_mailbox,
+        timeout,
+    }) {
+        Ok(ArcMsgOk::Ok { rc, arg }) => Ok((arg, rc)),
+        Ok(ArcMsgOk::OkNoWait) => unreachable!("ReadTs is always sent with wait_for_done"),
+        Err(err) => Err(err.to_string()),
+    }
+}
+
 macro_rules! common_chip_comms_impls {
     ($name:ty) => {
         #[pymethods]
@@ -383,15 +419,18 @@ macro_rules! common_chip_comms_impls {
             }
 
             #[pyo3(signature = (msg, wait_for_done = true, use_second_mailbox = false, arg0 = 0xffff, arg1 = 0xffff, timeout = 1.0))]
-            pub fn arc_msg(&self, msg: u32, wait_for_done: bool, use_second_mailbox: bool, arg0: u16, arg1: u16, timeout: f64) -> PyResult<Option<(u32, u32)>> {
-                match self.0
+            pub fn arc_msg(&self, py: Python<'_>, msg: u32, wait_for_done: bool, use_second_mailbox: bool, arg0: u16, arg1: u16, timeout: f64) -> PyResult<Option<(u32, u32)>> {
+                // Waiting on the arc doesn't touch any python objects, so let other python threads run in the meantime.
+                // PlatformError isn't Send, so it has to be turned into a string before it leaves the closure.
+                match py.allow_threads(|| self.0
                     .arc_msg(ArcMsgOptions {
                         addrs: None,
                         msg: ArcMsg::from_values(msg, arg0, arg1),
                         wait_for_done,
                         use_second_mailbox,
                         timeout: std::time::Duration::from_secs_f64(timeout),
-                    }) {
+                    })
+                    .map_err(|err| err.to_string())) {
                         Ok(ArcMsgOk::Ok {rc, arg}) => {
                             Ok(Some((arg, rc)))
                         }
@@ -399,10 +438,34 @@ macro_rules! common_chip_comms_impls {
                             Ok(None)
                         }
                         Err(err) => {
-                            Err(PyException::new_err(err.to_string()))
+                            Err(PyException::new_err(err))
                         }
                     }
             }
+
+            /// Read the raw value of a single temperature sensor.
+            /// Same as arc_msg(0x1B, arg0=sensor_idx, arg1=0) but without the keyword argument handling.
+            /// The message always goes to the first mailbox with a 1s timeout, use arc_msg if either needs to change.
+            #[pyo3(signature = (sensor_idx, /))]
+            pub fn read_ts(&self, py: Python<'_>, sensor_idx: u16) -> PyResult<(u32, u32)> {
+                py.allow_threads(|| read_ts_raw(&self.0, sensor_idx, false, std::time::Duration::from_secs(1)))
+                    .map_err(PyException::new_err)
+            }
+
+            /// Read the raw value of the first `count` temperature sensors.
+            /// The fw has no bulk read message, so this still sends one ReadTs per sensor,
+            /// but it does so back to back without returning to python in between.
+            #[pyo3(signature = (count = 8, use_second_mailbox = false, timeout = 1.0))]
+            pub fn arc_msg_bulk_readts(&self, py: Python<'_>, count: u16, use_second_mailbox: bool, timeout: f64) -> PyResult<Vec<(u32, u32)>> {
+                let timeout = std::time::Duration::from_secs_f64(timeout);
+
+                py.allow_threads(|| {
+                    (0..count)
+                        .map(|sensor| read_ts_raw(&self.0, sensor, use_second_mailbox, timeout))
+                        .collect::<Result<Vec<_>, _>>()
+                })
+                .map_err(PyException::new_err)
+            }
         }
     };
 }
@@ -431,12 +494,40 @@ impl PciChip {
 
 #[pymethods]
 impl PciChip {
-    pub fn as_wh(&self) -> Option<PciWormhole> {
-        self.0.as_wh().map(|v| PciWormhole(v.clone()))
+    pub fn as_wh(&self, py: Python<'_>) -> PyResult<Option<Py<PciWormhole>>> {
+        if self.1.wh.get().is_none() {
+            let wh = self
+                .0
+                .as_wh()
+                .map(|v| Py::new(py, PciWormhole(v.clone())))
+                .transpose()?;
+            let _ = self.1.wh.set(wh);
+        }
+
+        Ok(self
+            .1
+            .wh
+            .get()
+            .and_then(|v| v.as_ref())
+            .map(|v| v.clone_ref(py)))
     }
 
-    pub fn as_gs(&self) -> Option<PciGrayskull> {
-        self.0.as_gs().map(|v| PciGrayskull(v.clone()))
+    pub fn as_gs(&self, py: Python<'_>) -> PyResult<Option<Py<PciGrayskull>>> {
+        if self.1.gs.get().is_none() {
+            let gs = self
+                .0
+                .as_gs()
+                .map(|v| Py::new(py, PciGrayskull(v.clone())))
+                .transpose()?;
+            let _ = self.1.gs.set(gs);
+        }
+
+        Ok(self
+            .1
+            .gs
+            .get()
+            .and_then(|v| v.as_ref())
+            .map(|v| v.clone_ref(py)))
     }
 
     #[new]
@@ -447,7 +538,7 @@ impl PciChip {
 
         let arch = chip.borrow().device.arch;
 
-        PciChip(luwen_if::chip::Chip::open(
+        PciChip::from(luwen_if::chip::Chip::open(
             arch,
             luwen_if::CallbackStorage {
                 callback: luwen_ref::comms_callback,
@@ -838,13 +929,101 @@ pub struct RemoteWormhole(luwen_if::chip::Wormhole);
 
 common_chip_comms_impls!(RemoteWormhole);
 
+/// How long the result of `detect_chips` is reused before the chips are enumerated again.
+const DETECT_CACHE_TTL: std::time::Duration = std::time::Duration::from_secs(5);
+
+struct DetectCache {
+    interfaces: Vec<usize>,
+    arch: Option<luwen_core::Arch>,
+    detected_at: std::time::Instant,
+    /// `weakref.ref`s to the detected chips, so the cache never keeps a chip (and its device) open.
+    chips: Vec<PyObject>,
+}
+
+/// Chip detection walks every pci device and waits for arc init, so we hold onto the result
+/// and only redo it if the set of pci interfaces or the requested arch has changed, the cache has expired
+/// or any of the previously detected chips has since been dropped.
+static DETECT_CACHE: Mutex<Option<DetectCache>> = Mutex::new(None);
+
+/// Get the cached chips back, or None if any of them has already been dropped.
+fn upgrade_cached_chips(
+    py: Python<'_>,
+    cached: &DetectCache,
+) -> PyResult<Option<Vec<Py<PciChip>>>> {
+    let mut chips = Vec::with_capacity(cached.chips.len());
+    for weak in &cached.chips {
+        let chip = weak.call0(py)?;
+        if chip.is_none(py) {
+            return Ok(None);
+        }
+        chips.push(chip.extract(py)?);
+    }
+
+    Ok(Some(chips))
+}
+
+fn parse_arch(arch: &str) -> PyResult<luwen_core::Arch> {
+    match arch.to_lowercase().as_str() {
+        "grayskull" | "gs" => Ok(luwen_core::Arch::Grayskull),
+        "wormhole" | "wh" => Ok(luwen_core::Arch::Wormhole),
+        _ => Err(PyException::new_err(format!("Unknown arch {arch}"))),
+    }
+}
+
 #[pyfunction]
-pub fn detect_chips() -> Vec<PciChip> {
-    luwen_ref::detect_chips()
-        .unwrap()
+#[pyo3(signature = (force_refresh = false, arch = None))]
+pub fn detect_chips(
+    py: Python<'_>,
+    force_refresh: bool,
+    arch: Option<&str>,
+) -> PyResult<Vec<Py<PciChip>>> {
+    let arch = arch.map(parse_arch).transpose()?;
+    let interfaces = kmdif::PciDevice::scan();
+
+    {
+        let mut cache = DETECT_CACHE.lock().unwrap();
+        if let Some(cached) = cache.as_ref() {
+            if !force_refresh
+                && cached.interfaces == interfaces
+                && cached.arch == arch
+                && cached.detected_at.elapsed() < DETECT_CACHE_TTL
+            {
+                if let Some(chips) = upgrade_cached_chips(py, cached)? {
+                    return Ok(chips);
+                }
+            }
+        }
+
+        // The entry can't be used, so forget it before detecting again.
+        *cache = None;
+    }
+
+    // Detection doesn't touch any python objects, so let other python threads run while we wait on the chips.
+    // The cache lock must not be held here, otherwise a second caller could block on it while holding the GIL.
+    let chips = py
+        .allow_threads(|| {
+            luwen_ref::detect_chips_with_arch(arch.as_ref().map(std::slice::from_ref))
+                .map_err(|v| v.to_string())
+        })
+        .map_err(|v| PyException::new_err(format!("Could not detect chips: {}", v)))?
         .into_iter()
-        .map(|chip| PciChip(chip))
-        .collect()
+        .map(|chip| Py::new(py, PciChip::from(chip)))
+        .collect::<PyResult<Vec<_>>>()?;
+
+    let weakref = py.import("weakref")?.getattr("ref")?;
+    let weak_chips = chips
+        .iter()
+        .map(|chip| Ok(weakref.call1((chip.clone_ref(py),))?.into()))
+        .collect::<PyResult<Vec<PyObject>>>()?;
+
+    *DETECT_CACHE.lock().unwrap() = Some(DetectCache {
+        interfaces,
+        arch,
+        detected_at: std::time::Instant::now(),
+        chips: weak_chips,
+    });
+
+    Ok(chips)
 }
 
 #[pymodule]
@@ -1,7 +1,9 @@
 # Extremely heavily inspired by https://github.com/huggingface/tokenizers/blob/main/bindings/python/stub.py
 
 import argparse
+import functools
 import inspect
+import sys
 from pathlib import Path
 
 INDENT = " " * 4
@@ -13,109 +15,149 @@ def do_indent(text: str, indent: str):
 def function(obj, indent, text_signature=None):
     if text_signature is None:
         text_signature = obj.__text_signature__.replace("$self", "self")
-    string = ""
-    string += f"{indent}def {obj.__name__}{text_signature}:\n"
+    parts = []
+    parts.append(f"{indent}def {obj.__name__}{text_signature}:\n")
     indent += INDENT
-    string += f'{indent}"""\n'
+    parts.append(f'{indent}"""\n')
     if obj.__doc__ is not None and len(obj.__doc__) > 0:
-        string += f"{indent}{do_indent(obj.__doc__, indent)}\n"
-    string += f'{indent}"""\n'
-    string += f"{indent}pass\n"
-    string += "\n"
-    return string
+        parts.append(f"{indent}{do_indent(obj.__doc__, indent)}\n")
+    parts.append(f'{indent}"""\n')
+    parts.append(f"{indent}pass\n")
+    parts.append("\n")
+    return parts
+
+def member_kind(obj):
+    if inspect.ismodule(obj):
+        return "module"
+    if inspect.isclass(obj):
+        return "class"
+    if inspect.isbuiltin(obj):
+        return "builtin"
+    if inspect.ismethoddescriptor(obj):
+        return "method"
+    if inspect.isgetsetdescriptor(obj):
+        return "getset"
+    return None
+
+# The module is walked by write(), pyi_file() and py_file() and each class's mro is needed both for sorting and
+# for its header, so both lookups are cached. Modules and classes hash by identity, so they work as keys as is.
+@functools.lru_cache(maxsize=None)
+def get_members(obj):
+    # One dir() walk that skips private names before the getattr and tags each member with its kind,
+    # so that nothing downstream has to run the inspect.is* checks again
+    members = []
+    for name in dir(obj):
+        if name.startswith("_"):
+            continue
+        member = getattr(obj, name)
+        members.append((member_kind(member), name, member))
+    return tuple(members)
+
+@functools.lru_cache(maxsize=None)
+def get_mro(cls):
+    return inspect.getmro(cls)
 
 def member_sort(member):
-    if inspect.isclass(member):
-        value = 10 + len(inspect.getmro(member))
+    kind, _, obj = member
+    if kind == "class":
+        value = 10 + len(get_mro(obj))
     else:
         value = 1
     return value
 
-def fn_predicate(obj):
-    value = inspect.ismethoddescriptor(obj) or inspect.isbuiltin(obj)
-    if value:
-        return obj.__text_signature__ and not obj.__name__.startswith("_")
-    if inspect.isgetsetdescriptor(obj):
-        return obj.__doc__ is not None and not obj.__name__.startswith("_")
+def fn_predicate(member):
+    kind, _, obj = member
+    if kind in ("builtin", "method"):
+        return bool(obj.__text_signature__)
+    if kind == "getset":
+        return obj.__doc__ is not None
     return False
 
 def get_module_members(module):
-    members = [
-        member
-        for name, member in inspect.getmembers(module)
-        if not name.startswith("_") and not inspect.ismodule(member)
-    ]
+    members = [member for member in get_members(module) if member[0] != "module"]
     members.sort(key=member_sort)
     return members
 
 
-def pyi_file(obj, indent=""):
-    string = ""
-    if inspect.ismodule(obj):
-        string += GENERATED_COMMENT
-        members = get_module_members(obj)
-        for member in members:
-            string += pyi_file(member, indent)
-
-    elif inspect.isclass(obj):
-        indent += INDENT
-        mro = inspect.getmro(obj)
-        if len(mro) > 2:
-            inherit = f"({mro[1].__name__})"
-        else:
-            inherit = ""
-        string += f"class {obj.__name__}{inherit}:\n"
-
-        body = ""
-        if obj.__doc__ is not None and len(obj.__doc__) > 0:
-            body += f'{indent}"""\n{indent}{do_indent(obj.__doc__, indent)}\n{indent}"""\n'
-
-        fns = inspect.getmembers(obj, fn_predicate)
-
-        # Init
-        if obj.__text_signature__ is not None:
-            sig = obj.__text_signature__
-            if not sig.startswith("(self"):
-                sig = sig.replace("(", "(self, ")
-            body += f"{indent}def __init__{sig}:\n"
-            body += f"{indent+INDENT}pass\n"
-            body += "\n"
-
-        for (name, fn) in fns:
-            body += pyi_file(fn, indent=indent)
-
-        if len(body) > 0:
-            body += f"{indent}pass\n"
-
-        string += body
-        if not string.endswith("\n\n"):
-            string += "\n"
-
-    elif inspect.isbuiltin(obj):
-        string += f"{indent}@staticmethod\n"
-        string += function(obj, indent)
-
-    elif inspect.ismethoddescriptor(obj):
-        string += function(obj, indent)
-
-    elif inspect.isgetsetdescriptor(obj):
-        string += f"{indent}@property\n"
-        string += function(obj, indent, text_signature="(self)")
+def module_pyi(obj, indent):
+    parts = [GENERATED_COMMENT]
+    for kind, _, member in get_module_members(obj):
+        parts.extend(pyi_file(member, indent, kind=kind))
+    return parts
+
+def class_pyi(obj, indent):
+    parts = []
+    indent += INDENT
+    mro = get_mro(obj)
+    if len(mro) > 2:
+        inherit = f"({mro[1].__name__})"
     else:
+        inherit = ""
+    parts.append(f"class {obj.__name__}{inherit}:\n")
+
+    body = []
+    if obj.__doc__ is not None and len(obj.__doc__) > 0:
+        body.append(f'{indent}"""\n{indent}{do_indent(obj.__doc__, indent)}\n{indent}"""\n')
+
+    fns = [member for member in get_members(obj) if fn_predicate(member)]
+
+    # Init
+    if obj.__text_signature__ is not None:
+        sig = obj.__text_signature__
+        if not sig.startswith("(self"):
+            sig = sig.replace("(", "(self, ")
+        body.append(f"{indent}def __init__{sig}:\n")
+        body.append(f"{indent+INDENT}pass\n")
+        body.append("\n")
+
+    for (kind, _, fn) in fns:
+        body.extend(pyi_file(fn, indent=indent, kind=kind))
+
+    if len(body) > 0:
+        body.append(f"{indent}pass\n")
+
+    parts.extend(body)
+    # Only the trailing fragments can decide whether the class already ends in a blank line
+    if not "".join(parts[-2:]).endswith("\n\n"):
+        parts.append("\n")
+    return parts
+
+def builtin_pyi(obj, indent):
+    return [f"{indent}@staticmethod\n", *function(obj, indent)]
+
+def method_pyi(obj, indent):
+    return function(obj, indent)
+
+def getset_pyi(obj, indent):
+    return [f"{indent}@property\n", *function(obj, indent, text_signature="(self)")]
+
+PYI_WRITERS = {
+    "module": module_pyi,
+    "class": class_pyi,
+    "builtin": builtin_pyi,
+    "method": method_pyi,
+    "getset": getset_pyi,
+}
+
+def pyi_file(obj, indent="", kind=None):
+    if kind is None:
+        kind = member_kind(obj)
+    writer = PYI_WRITERS.get(kind)
+    if writer is None:
         raise Exception(f"Object {obj} is not supported")
-    return string
+    return writer(obj, indent)
 
 
 def py_file(module, origin):
     members = get_module_members(module)
 
-    string = GENERATED_COMMENT
-    string += f"from .. import {origin}\n"
-    string += "\n"
-    for member in members:
+    parts = [GENERATED_COMMENT]
+    parts.append(f"from .. import {origin}\n")
+    parts.append("\n")
+    for _, _, member in members:
         name = member.__name__
-        string += f"{name} = {origin}.{name}\n"
-    return string
+        parts.append(f"{name} = {origin}.{name}\n")
+    return parts
 
 
 # def do_black(content, is_pyi):
@@ -133,11 +175,21 @@ def py_file(module, origin):
 
 
 def write(module, pyi_filename, check=False):
-    submodules = [(name, member) for name, member in inspect.getmembers(module) if inspect.ismodule(member)]
-
-    pyi_content = pyi_file(module)
-    with open(pyi_filename, "w") as f:
-        f.write(pyi_content)
+    submodules = [(name, member) for kind, name, member in get_members(module) if kind == "module"]
+
+    pyi_content = "".join(pyi_file(module))
+
+    pyi_filename = Path(pyi_filename)
+    existing = pyi_filename.read_text() if pyi_filename.exists() else ""
+    if check:
+        # Don't use assert here, it is stripped under python -O and the check would always pass
+        if existing != pyi_content:
+            print(f"The content of {pyi_filename} seems outdated, please run `python stub.py`", file=sys.stderr)
+            sys.exit(1)
+    elif existing != pyi_content:
+        # Leave the file (and its mtime) alone when nothing changed so that tools watching it don't reindex
+        with open(pyi_filename, "w") as f:
+            f.write(pyi_content)
 
     assert len(submodules) == 0, "There are now submodules for pyluwen, you should extend this to support generating .pyi files for them"
 